@@ -1,93 +1,127 @@
+import atexit
+import functools
 import json
 import os
 import random
+import sys
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
+
+import msgpack
+
+# Cooldown between attempt resets, in seconds
+RESET_SECONDS = 900.0
+
+SYMBOLS = ("🎰", "💎", "🎁", "⭐", "🍀", "🎯")
+
+# Fresh-player defaults; last_reset_ts is filled in at creation time
+_DEFAULT_STATE = {
+    "balance": 0,
+    "tokens": 0,
+    "attempts_left": 10,
+    "total_wins": 0,
+    "total_losses": 0,
+}
+
+# Lazily memoized display strings per row of symbol indices (6^3 = 216 max)
+_ROW_STRS = {}
+
+
+def _row_str(i, j, k):
+    """Display string for a row of three symbol indices"""
+    key = (i, j, k)
+    row = _ROW_STRS.get(key)
+    if row is None:
+        row = _ROW_STRS[key] = f"{SYMBOLS[i]} {SYMBOLS[j]} {SYMBOLS[k]}"
+    return row
+
 
 class GachaGame:
     def __init__(self, save_file="player_data.json"):
         self.save_file = save_file
         self.player_data = self.load_data()
-        
+        # Unsaved changes to player_data; written out by flush()
+        self._dirty = False
+
     def load_data(self):
         """Load player data from file or create new player"""
         if os.path.exists(self.save_file):
-            with open(self.save_file, 'r') as f:
-                return json.load(f)
-        return {
-            "balance": 0,
-            "tokens": 0,
-            "attempts_left": 10,
-            "last_reset_time": datetime.now().isoformat(),
-            "total_wins": 0,
-            "total_losses": 0
-        }
+            with open(self.save_file, 'rb') as f:
+                raw = f.read()
+            if raw.startswith(b"{"):
+                # Legacy JSON save; migrate to msgpack once
+                data = json.loads(raw)
+            else:
+                data = msgpack.unpackb(raw, raw=False)
+            if "last_reset_time" in data:
+                # Legacy ISO timestamp; convert to epoch seconds once
+                data["last_reset_ts"] = datetime.fromisoformat(
+                    data.pop("last_reset_time")).timestamp()
+            if raw.startswith(b"{") or "last_reset_ts" not in data:
+                self._write_save(data)
+            return data
+        return {**_DEFAULT_STATE, "last_reset_ts": time.time()}
     
+    def _write_save(self, data):
+        """Atomically write save data: whole payload to a temp file, then rename"""
+        payload = msgpack.packb(data)
+        tmp = self.save_file + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp, self.save_file)
+
     def save_data(self):
         """Save player data to file"""
-        with open(self.save_file, 'w') as f:
-            json.dump(self.player_data, f, indent=2)
-    
-    def check_reset_cooldown(self):
+        self._write_save(self.player_data)
+        self._dirty = False
+
+    def flush(self, force=False):
+        """Write player data to disk if there are unsaved changes"""
+        if self._dirty or force:
+            self.save_data()
+
+    def check_reset_cooldown(self, now=None):
         """Check if 15 minutes have passed to reset attempts"""
-        last_reset = datetime.fromisoformat(self.player_data["last_reset_time"])
-        now = datetime.now()
-        
-        if now >= last_reset + timedelta(minutes=15):
+        if now is None:
+            now = time.time()
+
+        if now - self.player_data["last_reset_ts"] >= RESET_SECONDS:
             self.player_data["attempts_left"] = 10
-            self.player_data["last_reset_time"] = now.isoformat()
-            self.save_data()
+            self.player_data["last_reset_ts"] = now
+            self._dirty = True
             return True
         return False
-    
-    def get_time_until_reset(self):
+
+    def get_time_until_reset(self, now=None):
         """Get remaining time until next reset in seconds"""
-        last_reset = datetime.fromisoformat(self.player_data["last_reset_time"])
-        next_reset = last_reset + timedelta(minutes=15)
-        now = datetime.now()
-        
-        if now >= next_reset:
-            return 0
-        
-        remaining = (next_reset - now).total_seconds()
-        return remaining
+        if now is None:
+            now = time.time()
+        return max(0.0, RESET_SECONDS - (now - self.player_data["last_reset_ts"]))
     
     def spin_gacha(self):
         """Perform a gacha spin with 3 rows
-        Returns: (result, is_win, row1, row2, row3)
+        Returns: (is_win, idx) where idx holds 9 symbol indices
         """
-        symbols = ["🎰", "💎", "🎁", "⭐", "🍀", "🎯"]
-        
-        # Generate 3 rows
-        row1 = [random.choice(symbols) for _ in range(3)]
-        row2 = [random.choice(symbols) for _ in range(3)]
-        row3 = [random.choice(symbols) for _ in range(3)]
-        
-        # Check for win conditions
-        is_win = False
-        
-        # Check if all 3 middle symbols are the same
-        if row1[1] == row2[1] == row3[1]:
-            is_win = True
-        
-        # Check if all 3 symbols in any row are the same
-        if row1[0] == row1[1] == row1[2]:
-            is_win = True
-        if row2[0] == row2[1] == row2[2]:
-            is_win = True
-        if row3[0] == row3[1] == row3[2]:
-            is_win = True
-        
-        return is_win, row1, row2, row3
+        # Draw symbol indices and do the win check on ints; emoji string
+        # comparisons are much slower than small-int compares
+        idx = random.choices(range(len(SYMBOLS)), k=9)
+
+        # Middle column, then each row
+        is_win = (idx[1] == idx[4] == idx[7]
+                  or any(idx[i] == idx[i + 1] == idx[i + 2] for i in (0, 3, 6)))
+
+        return is_win, idx
     
     def gacha_spin(self):
         """Execute a gacha spin"""
-        # Check if cooldown has passed
-        self.check_reset_cooldown()
+        # One timestamp for the whole spin; avoids a second clock read and
+        # keeps the cooldown check and countdown consistent
+        now = time.time()
+        self.check_reset_cooldown(now)
         
         # Check if attempts available
         if self.player_data["attempts_left"] <= 0:
-            time_left = self.get_time_until_reset()
+            time_left = self.get_time_until_reset(now)
             minutes = int(time_left // 60)
             seconds = int(time_left % 60)
             return {
@@ -97,14 +131,14 @@ class GachaGame:
             }
         
         # Perform spin
-        is_win, row1, row2, row3 = self.spin_gacha()
+        is_win, idx = self.spin_gacha()
         self.player_data["attempts_left"] -= 1
         
         # Display results
         result = {
-            "row1": " ".join(row1),
-            "row2": " ".join(row2),
-            "row3": " ".join(row3),
+            "row1": _row_str(idx[0], idx[1], idx[2]),
+            "row2": _row_str(idx[3], idx[4], idx[5]),
+            "row3": _row_str(idx[6], idx[7], idx[8]),
         }
         
         if is_win:
@@ -123,12 +157,15 @@ class GachaGame:
         
         # Show reset timer if no attempts left
         if self.player_data["attempts_left"] == 0:
-            time_left = self.get_time_until_reset()
+            time_left = self.get_time_until_reset(now)
             minutes = int(time_left // 60)
             seconds = int(time_left % 60)
             result["next_reset"] = f"Reset dalam: {minutes}m {seconds}s"
         
-        self.save_data()
+        self._dirty = True
+        # No attempts left means no writes for a while; flush the batch now
+        if self.player_data["attempts_left"] == 0:
+            self.flush()
         return result
     
     def buy_gacha_pack(self, quantity=1):
@@ -137,7 +174,7 @@ class GachaGame:
         """
         tokens_gained = 5 * quantity
         self.player_data["tokens"] += tokens_gained
-        self.save_data()
+        self._dirty = True
         
         return {
             "success": True,
@@ -148,8 +185,9 @@ class GachaGame:
     
     def get_player_status(self):
         """Get current player status"""
-        self.check_reset_cooldown()
-        time_left = self.get_time_until_reset()
+        now = time.time()
+        self.check_reset_cooldown(now)
+        time_left = self.get_time_until_reset(now)
         minutes = int(time_left // 60)
         seconds = int(time_left % 60)
         
@@ -164,109 +202,135 @@ class GachaGame:
     
     def reset_game(self):
         """Reset player data (for testing)"""
-        self.player_data = {
-            "balance": 0,
-            "tokens": 0,
-            "attempts_left": 10,
-            "last_reset_time": datetime.now().isoformat(),
-            "total_wins": 0,
-            "total_losses": 0
-        }
+        self.player_data = {**_DEFAULT_STATE, "last_reset_ts": time.time()}
         self.save_data()
         return {"message": "✅ Data game direset"}
 
 
+# The menu never changes; build it once and emit it with a single write
+_MENU = "\n".join([
+    "",
+    "=" * 50,
+    "🎰 MINI GACHA GAMBLING GAME 🎰",
+    "=" * 50,
+    "1. 🎯 Main Gacha (1 kesempatan)",
+    "2. 💳 Beli Pack Gacha (5x token)",
+    "3. 📊 Lihat Status",
+    "4. 🔄 Reset Game (untuk testing)",
+    "5. ❌ Keluar",
+    "=" * 50,
+]) + "\n"
+
+
 def display_menu():
     """Display main menu"""
-    print("\n" + "="*50)
-    print("🎰 MINI GACHA GAMBLING GAME 🎰")
-    print("="*50)
-    print("1. 🎯 Main Gacha (1 kesempatan)")
-    print("2. 💳 Beli Pack Gacha (5x token)")
-    print("3. 📊 Lihat Status")
-    print("4. 🔄 Reset Game (untuk testing)")
-    print("5. ❌ Keluar")
-    print("="*50)
+    sys.stdout.write(_MENU)
+
 
+_M = 1_000_000
+_K = 1_000
 
+
+@functools.lru_cache(maxsize=256)
 def format_currency(amount):
-    """Format number as currency"""
-    if amount >= 1_000_000:
-        return f"{amount/1_000_000:.1f}M"
-    elif amount >= 1_000:
-        return f"{amount/1_000:.1f}K"
+    """Format number as currency (memoized; balances repeat across redraws)"""
+    if amount >= _M:
+        return f"{amount/_M:.1f}M"
+    elif amount >= _K:
+        return f"{amount/_K:.1f}K"
     return str(amount)
 
 
+def _handle_spin(game):
+    """Menu 1: perform a gacha spin and show the result"""
+    print("\n🎯 Melakukan spin gacha...\n")
+    result = game.gacha_spin()
+
+    print("━" * 50)
+    print(f"  {result['row1']}")
+    print(f"  {result['row2']}")
+    print(f"  {result['row3']}")
+    print("━" * 50)
+    print(f"\n{result['message']}")
+    print(f"💰 Saldo: {format_currency(result['balance'])} coin")
+    print(f"⚡ Kesempatan tersisa: {result['attempts_left']}/10")
+
+    if "next_reset" in result:
+        print(f"⏰ {result['next_reset']}")
+
+
+def _handle_buy(game):
+    """Menu 2: buy gacha packs"""
+    print("\n💳 === BUY GACHA PACK ===")
+    print("1 Pack = 5x Token")
+    try:
+        qty = int(input("Berapa pack yang ingin dibeli? "))
+        if qty < 1:
+            print("❌ Jumlah harus minimal 1 pack")
+            return
+
+        result = game.buy_gacha_pack(qty)
+        print(f"\n{result['message']}")
+        print(f"💰 Saldo: {format_currency(result['balance'])} coin")
+        print(f"🎟️  Token total: {result['tokens']}")
+    except ValueError:
+        print("❌ Input tidak valid!")
+
+
+def _handle_status(game):
+    """Menu 3: show player status"""
+    print("\n📊 === STATUS PEMAIN ===")
+    status = game.get_player_status()
+    print(f"💰 Saldo: {format_currency(status['balance'])} coin")
+    print(f"🎟️  Token: {status['tokens']}")
+    print(f"⚡ Kesempatan: {status['attempts_left']}/10")
+    print(f"🎉 Total Menang: {status['total_wins']}")
+    print(f"😢 Total Kalah: {status['total_losses']}")
+
+    if status['total_wins'] + status['total_losses'] > 0:
+        win_rate = (status['total_wins'] / (status['total_wins'] + status['total_losses'])) * 100
+        print(f"📈 Win Rate: {win_rate:.1f}%")
+
+    print(f"⏰ Reset dalam: {status['next_reset']}")
+
+
+def _handle_reset(game):
+    """Menu 4: reset player data after confirmation"""
+    confirm = input("⚠️  Yakin ingin reset? (yes/no): ").strip().lower()
+    if confirm == "yes":
+        game.reset_game()
+        print("✅ Game berhasil direset!")
+    else:
+        print("❌ Reset dibatalkan")
+
+
+_HANDLERS = {
+    "1": _handle_spin,
+    "2": _handle_buy,
+    "3": _handle_status,
+    "4": _handle_reset,
+}
+
+
 def main():
     """Main game loop"""
     game = GachaGame()
-    
+    atexit.register(game.flush)
+
     print("\n🎰 Selamat datang di Mini Gacha Gambling Game! 🎰")
-    
+
     while True:
         display_menu()
         choice = input("Pilih menu (1-5): ").strip()
-        
-        if choice == "1":
-            print("\n🎯 Melakukan spin gacha...\n")
-            result = game.gacha_spin()
-            
-            print("━" * 50)
-            print(f"  {result['row1']}")
-            print(f"  {result['row2']}")
-            print(f"  {result['row3']}")
-            print("━" * 50)
-            print(f"\n{result['message']}")
-            print(f"💰 Saldo: {format_currency(result['balance'])} coin")
-            print(f"⚡ Kesempatan tersisa: {result['attempts_left']}/10")
-            
-            if "next_reset" in result:
-                print(f"⏰ {result['next_reset']}")
-        
-        elif choice == "2":
-            print("\n💳 === BUY GACHA PACK ===")
-            print("1 Pack = 5x Token")
-            try:
-                qty = int(input("Berapa pack yang ingin dibeli? "))
-                if qty < 1:
-                    print("❌ Jumlah harus minimal 1 pack")
-                    continue
-                
-                result = game.buy_gacha_pack(qty)
-                print(f"\n{result['message']}")
-                print(f"💰 Saldo: {format_currency(result['balance'])} coin")
-                print(f"🎟️  Token total: {result['tokens']}")
-            except ValueError:
-                print("❌ Input tidak valid!")
-        
-        elif choice == "3":
-            print("\n📊 === STATUS PEMAIN ===")
-            status = game.get_player_status()
-            print(f"💰 Saldo: {format_currency(status['balance'])} coin")
-            print(f"🎟️  Token: {status['tokens']}")
-            print(f"⚡ Kesempatan: {status['attempts_left']}/10")
-            print(f"🎉 Total Menang: {status['total_wins']}")
-            print(f"😢 Total Kalah: {status['total_losses']}")
-            
-            if status['total_wins'] + status['total_losses'] > 0:
-                win_rate = (status['total_wins'] / (status['total_wins'] + status['total_losses'])) * 100
-                print(f"📈 Win Rate: {win_rate:.1f}%")
-            
-            print(f"⏰ Reset dalam: {status['next_reset']}")
-        
-        elif choice == "4":
-            confirm = input("⚠️  Yakin ingin reset? (yes/no): ").strip().lower()
-            if confirm == "yes":
-                game.reset_game()
-                print("✅ Game berhasil direset!")
-            else:
-                print("❌ Reset dibatalkan")
-        
-        elif choice == "5":
+
+        if choice == "5":
+            game.flush()
             print("\n👋 Terima kasih telah bermain! Sampai jumpa lagi!")
             break
-        
+
+        handler = _HANDLERS.get(choice)
+        if handler:
+            handler(game)
         else:
             print("❌ Pilihan tidak valid!")
 